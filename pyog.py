@@ -1,8 +1,18 @@
 # -*- coding: utf-8 -*-
-import json
+import ctypes
+import errno
+import functools
+import os
+import select
 import socket
 import struct
-import time
+import sys
+import warnings
+from array import array
+from collections.abc import Mapping
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
 
 OG_FLAG_KEYS = {
     0: "shift_key",
@@ -27,8 +37,100 @@ DL_FLAG_KEYS = {
     11: "spare",
 }
 
+# Precompiled so the format strings aren't parsed again for every packet
+_OG_STRUCT = struct.Struct("I4sHbbfffffffIIfff16s16sxxxx")
+# MotionSim is all floats after the magic, but reading them through a memoryview cast
+# or an array.array is no faster than this once the dict is built (slower for array)
+_MS_STRUCT = struct.Struct("4sfffffffffffffffffffff")
 
-def create_socket(ip: str, port: int) -> socket.socket:
+# Strings in both protocols are NUL padded ASCII, hoisted to skip the attribute lookup
+_decode = bytes.decode
+
+# Packets are received into these instead of allocating new bytes for each one. The
+# spare byte shows when a packet was too long where MSG_TRUNC can't say how long
+_og_buf = bytearray(_OG_STRUCT.size + 1)
+_ms_buf = bytearray(_MS_STRUCT.size + 1)
+# Slicing a memoryview doesn't copy, unlike slicing the bytearray itself
+_og_view = memoryview(_og_buf)
+
+_MSG_WAITFORONE = 0x10000
+# Makes Linux report a packet's real size even when it didn't fit in the buffer
+_MSG_TRUNC = getattr(socket, "MSG_TRUNC", 0)
+# Not on Windows, where draining the socket falls back to select()
+_MSG_DONTWAIT = getattr(socket, "MSG_DONTWAIT", 0)
+# Windows refuses datagrams that don't fit in the buffer rather than cutting them off
+_WSAEMSGSIZE = 10040
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+# recvmmsg() is Linux only, everywhere else batches fall back to recvfrom()
+_recvmmsg = None
+if sys.platform.startswith("linux"):
+    try:
+        _recvmmsg = ctypes.CDLL(None, use_errno=True).recvmmsg
+        _recvmmsg.argtypes = [
+            ctypes.c_int,
+            ctypes.POINTER(_MMsgHdr),
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_void_p,
+        ]
+        _recvmmsg.restype = ctypes.c_int
+    except (OSError, AttributeError):
+        _recvmmsg = None
+
+
+class _MMsgBatch:
+    """
+    Preallocated buffers and message headers for one recvmmsg() call
+    """
+
+    def __init__(self, n: int, size: int):
+        self.buffers = [bytearray(size) for _ in range(n)]
+        self.views = [memoryview(buf) for buf in self.buffers]
+        self.iovecs = (_IOVec * n)()
+        self.msgs = (_MMsgHdr * n)()
+        for i, buf in enumerate(self.buffers):
+            self.iovecs[i].iov_base = ctypes.addressof(
+                (ctypes.c_char * size).from_buffer(buf)
+            )
+            self.iovecs[i].iov_len = size
+            self.msgs[i].msg_hdr.msg_iov = ctypes.pointer(self.iovecs[i])
+            self.msgs[i].msg_hdr.msg_iovlen = 1
+
+
+# Bounded, as every different `n` would otherwise keep its buffers around for good
+@functools.lru_cache(maxsize=4)
+def _get_mmsg_batch(n: int, size: int) -> _MMsgBatch:
+    return _MMsgBatch(n, size)
+
+
+def create_socket(
+    ip: str,
+    port: int,
+    recv_buf: Optional[int] = None,
+    reuse_port: bool = False,
+    cpu: Optional[int] = None,
+) -> socket.socket:
     """
     Creates a UDP server socket to connect to OutGauge
 
@@ -38,19 +140,93 @@ def create_socket(ip: str, port: int) -> socket.socket:
         The IP Address to connect to (probably 127.0.0.1)
     port : int
         The port to connect on (probably 2222)
+    recv_buf : int, optional
+        The size of the kernel receive buffer to ask for, in bytes. A big buffer (a
+        few MiB) stops packets from being dropped when they arrive in bursts, but
+        most systems limit it, for example to net.core.rmem_max on Linux. Defaults
+        to the OS's own size
+    reuse_port : bool
+        Lets several sockets bind the same port, for example one per reader thread.
+        On Linux the kernel then spreads the packets between them, so each packet
+        only goes to one of the sockets. Raises NotImplementedError where the OS
+        has no SO_REUSEPORT
+    cpu : int, optional
+        Linux and Python 3.11+ only, raising NotImplementedError elsewhere, and needs
+        `reuse_port`. Out of the sockets sharing the port, the kernel then hands
+        this one the packets that were received on that CPU. The calling thread is
+        pinned to the same CPU once the socket is bound, so they stay in its cache
 
     Returns
     -------
     sock : socket.socket
         The socket to use for getting data
     """
+    if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+        raise NotImplementedError("SO_REUSEPORT isn't supported on this platform")
+    if cpu is not None and not (
+        hasattr(socket, "SO_INCOMING_CPU") and hasattr(os, "sched_setaffinity")
+    ):
+        raise NotImplementedError("cpu needs Linux and Python 3.11 or newer")
+    if cpu is not None and not reuse_port:
+        raise ValueError("cpu only steers packets between sockets with reuse_port")
+
     sock = socket.socket(family=socket.AF_INET, type=socket.SOCK_DGRAM)
-    sock.bind((ip, port))
+    try:
+        _setup_socket(sock, ip, port, recv_buf, reuse_port, cpu)
+    except BaseException:
+        sock.close()
+        raise
 
     return sock
 
 
-def parse_flags(flag_data: int, flag_keys: dict[int, str]) -> dict[str, bool]:
+def _setup_socket(
+    sock: socket.socket,
+    ip: str,
+    port: int,
+    recv_buf: Optional[int],
+    reuse_port: bool,
+    cpu: Optional[int],
+):
+    """
+    Applies the options from create_socket() and binds the socket
+    """
+    if recv_buf is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buf)
+        except OSError as e:
+            # macOS and the BSDs refuse sizes over their limit instead of capping
+            warnings.warn(
+                f"Couldn't set the receive buffer to {recv_buf} bytes ({e}), "
+                "using the OS default instead",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+        else:
+            # Linux reports double the usable size, and quietly caps it at rmem_max
+            actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            if sys.platform.startswith("linux"):
+                actual //= 2
+            if actual < recv_buf:
+                warnings.warn(
+                    f"Receive buffer is {actual} bytes instead of {recv_buf}, raise "
+                    "the OS limit (net.core.rmem_max on Linux) to allow a bigger one",
+                    RuntimeWarning,
+                    stacklevel=3,
+                )
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    if cpu is not None:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_INCOMING_CPU, cpu)
+    sock.bind((ip, port))
+    # Only once nothing else can fail, so a failed call doesn't leave the thread pinned
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+
+
+def parse_flags(
+    flag_data: int, flag_keys: Union[tuple[tuple[int, str], ...], dict[int, str]]
+) -> dict[str, bool]:
     """
     Parses flags into their respective booleans
 
@@ -58,52 +234,256 @@ def parse_flags(flag_data: int, flag_keys: dict[int, str]) -> dict[str, bool]:
     ----------
     flag_data : int
         The flag data straight from unpacking the UDP data
-    flag_keys : dict[int, str]
-        The flag keys in a dict with the key as the index of the bit with the flag
-        and the value being the key for that item in the resultant dict
+    flag_keys : tuple[tuple[int, str], ...] | dict[int, str]
+        The flag keys as (mask, name) pairs, or in a dict with the key as the index
+        of the bit with the flag and the value being the key for that item in the
+        resultant dict
 
     Returns
     -------
-    result : dict[str, str]
+    result : dict[str, bool]
         The dict for all of the information in this set of flags
     """
-    result = dict()
-    for key in flag_keys:
-        # Getting the name of this flag from the dict
-        result_key = flag_keys[key]
+    if isinstance(flag_keys, dict):
+        return {name: (flag_data & (1 << bit)) != 0 for bit, name in flag_keys.items()}
 
-        if flag_data & (2**key):
-            result[result_key] = True
-        else:
-            result[result_key] = False
+    return {name: (flag_data & mask) != 0 for mask, name in flag_keys}
+
+
+def _flag_masks(flag_keys: dict[int, str]) -> tuple[tuple[int, str], ...]:
+    """
+    Turns a dict of bit index to flag name into (mask, name) pairs
+    """
+    return tuple((1 << bit, name) for bit, name in flag_keys.items())
 
-    return result
 
+# Computed once so parsing doesn't redo the shifts and lookups for every packet
+_OG_FLAGS = _flag_masks(OG_FLAG_KEYS)
+_DL_FLAGS = _flag_masks(DL_FLAG_KEYS)
 
-def read_outgauge_data(sock: socket.socket, buffer_size: int = 256) -> dict:
+
+def parse_og_flags(flag_data: int) -> dict[str, bool]:
+    """
+    Parses OutGauge flags into a dict of booleans, like
+    `parse_flags(flag_data, OG_FLAG_KEYS)` but written out flag by flag so there's
+    no loop. Keep it in sync with OG_FLAG_KEYS
+
+    Parameters
+    ----------
+    flag_data : int
+        The flags straight from unpacking the UDP data
+
+    Returns
+    -------
+    result : dict[str, bool]
+        Each flag in OG_FLAG_KEYS and whether it is set
+    """
+    return {
+        "shift_key": (flag_data & 0x1) != 0,
+        "ctrl_key": (flag_data & 0x2) != 0,
+        "show_turbo": (flag_data & 0x2000) != 0,
+        "prefer_km": (flag_data & 0x4000) != 0,
+        "prefer_bar": (flag_data & 0x8000) != 0,
+    }
+
+
+def parse_dl_flags(flag_data: int) -> dict[str, bool]:
+    """
+    Parses dash light flags into a dict of booleans, like
+    `parse_flags(flag_data, DL_FLAG_KEYS)` but written out flag by flag so there's
+    no loop. Keep it in sync with DL_FLAG_KEYS
+
+    Parameters
+    ----------
+    flag_data : int
+        The dash lights straight from unpacking the UDP data
+
+    Returns
+    -------
+    result : dict[str, bool]
+        Each flag in DL_FLAG_KEYS and whether it is set
+    """
+    return {
+        "shift_light": (flag_data & 0x1) != 0,
+        "full_beam": (flag_data & 0x2) != 0,
+        "handbrake": (flag_data & 0x4) != 0,
+        "pit_speed_limiter": (flag_data & 0x8) != 0,
+        "tc": (flag_data & 0x10) != 0,
+        "signal_left": (flag_data & 0x20) != 0,
+        "signal_right": (flag_data & 0x40) != 0,
+        "signal_any": (flag_data & 0x80) != 0,
+        "oil_warning": (flag_data & 0x100) != 0,
+        "battery_warning": (flag_data & 0x200) != 0,
+        "abs": (flag_data & 0x400) != 0,
+        "spare": (flag_data & 0x800) != 0,
+    }
+
+
+class _FlagsView(Mapping):
+    """
+    Read-only dict-like view over a raw flag word, which only checks a flag's bit
+    when it is looked up. Use `dict(view)` to get a plain dict of all the flags.
+    """
+
+    __slots__ = ("raw", "map")
+
+    def __init__(self, raw: int, masks: dict[str, int]):
+        self.raw = raw
+        self.map = masks
+
+    def __getitem__(self, key: str) -> bool:
+        return (self.raw & self.map[key]) != 0
+
+    def __iter__(self):
+        return iter(self.map)
+
+    def __len__(self) -> int:
+        return len(self.map)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+# Flag names to their bit masks, for checking single flags in the raw integers.
+# Also shared by every view so nothing but the view itself is allocated per packet
+OG_FLAG_MASKS = {name: mask for mask, name in _OG_FLAGS}
+DL_FLAG_MASKS = {name: mask for mask, name in _DL_FLAGS}
+
+
+# The order of the OutGauge floats in read_outgauge_floats(), as they are in the packet
+OG_FLOAT_KEYS = (
+    "speed",
+    "rpm",
+    "turbo",
+    "eng_temp",
+    "fuel",
+    "oil_pressure",
+    "oil_temp",
+    "throttle",
+    "brake",
+    "clutch",
+)
+
+
+def read_outgauge_data(
+    sock: socket.socket, buffer_size: Optional[int] = None, raw_flags: bool = False
+) -> dict:
     """
     Reads the data from the socket and returns a dict with all of the information
-    from the OutGauge packet.
+    from the OutGauge packet. Packets are received into a buffer shared between
+    calls, so read from a single thread or give each thread its own reader.
     See: https://documentation.beamng.com/modding/protocols/#outgauge-udp-protocol
 
     Parameters
     ----------
     sock : socket.socket
         The socket to read data off of
-    buffer_size : int
-        The size of the buffer to read from the socket
+    buffer_size : int, optional
+        Deprecated and unused, as packets are always received whole. Passing it
+        gives a DeprecationWarning
+    raw_flags : bool
+        If True, "flags", "dash_lights" and "show_lights" are left as the raw
+        integers, which is quickest when only a flag or two is needed. Check one
+        with `bool(parsed_data["dash_lights"] & DL_FLAG_MASKS["handbrake"])`
 
     Returns
     -------
     parsed_data : dict
-        The data nicely formatted into a dict
+        The data nicely formatted into a dict. Unless `raw_flags` is set, the flag
+        fields are read-only dict-like views that only check a bit when it is looked
+        up, and their raw integers are kept under the `_raw` keys either way
+    """
+    if buffer_size is not None:
+        _warn_buffer_size()
+    _check_size(_recv_packet(sock, _og_buf), _OG_STRUCT.size)
+    return _parse_outgauge(_OG_STRUCT.unpack_from(_og_buf), raw_flags)
+
+
+def read_outgauge_floats(sock: socket.socket) -> array:
+    """
+    Reads the next OutGauge packet from the socket but only returns its floats, as
+    one array in the order of OG_FLOAT_KEYS. They are copied straight out of the
+    packet, so this is quicker than read_outgauge_data() when only the floats are
+    needed, for example for filtering or plotting. Uses the same buffer between
+    calls as read_outgauge_data(), so read from a single thread.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+
+    Returns
+    -------
+    floats : array.array
+        The speed, rpm, pedals and so on as 32 bit floats
+    """
+    _check_size(_recv_packet(sock, _og_buf), _OG_STRUCT.size)
+    floats = array("f")
+    floats.frombytes(_og_view[12:40])
+    floats.frombytes(_og_view[48:60])
+    return floats
+
+
+def _check_size(received: int, size: int):
     """
-    raw_data = sock.recvfrom(buffer_size)
-    data = struct.unpack("I4sHbbfffffffIIfff16s16sxxxx", raw_data[0])
+    Makes sure a packet was exactly the expected size. The buffers are reused, so a
+    short packet would otherwise be hidden behind stale data, and a long one has been
+    cut off, which usually means something else is sending to the same port
+    """
+    if received != size:
+        # A long packet fills the spare byte, and only Linux gives its real size
+        got = "a longer one" if received == size + 1 else f"{received} bytes"
+        raise struct.error(
+            f"Expected a {size} byte packet but got {got}, check that only one "
+            "stream is being sent to this port"
+        )
+
+
+def _recv_packet(sock: socket.socket, buf: bytearray) -> int:
+    """
+    Receives one datagram into `buf`, which has a spare byte past the packet size,
+    and returns its size
+    """
+    try:
+        return sock.recv_into(buf, 0, _MSG_TRUNC)
+    except OSError as e:
+        return _too_long(e, buf)
+
+
+def _too_long(e: OSError, buf: bytearray) -> int:
+    """
+    Turns the error Windows gives for a datagram that didn't fit in `buf` into a
+    size that _check_size() rejects, and re-raises any other error
+    """
+    if getattr(e, "winerror", None) != _WSAEMSGSIZE:
+        raise e
+    return len(buf)
+
+
+def _warn_buffer_size():
+    warnings.warn(
+        "buffer_size is unused and will be removed, packets are always received "
+        "whole",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+
+
+def _parse_outgauge(data: tuple, raw_flags: bool = False) -> dict:
+    """
+    Formats the unpacked fields of an OutGauge packet into a dict
+    """
+    if raw_flags:
+        flags, dash_lights, show_lights = data[2], data[12], data[13]
+    else:
+        flags = _FlagsView(data[2], OG_FLAG_MASKS)
+        dash_lights = _FlagsView(data[12], DL_FLAG_MASKS)
+        show_lights = _FlagsView(data[13], DL_FLAG_MASKS)
     return {
         "time": data[0],
-        "car": data[1].decode("utf-8"),
-        "flags": parse_flags(data[2], OG_FLAG_KEYS),
+        "car": _decode(data[1].rstrip(b"\x00"), "ascii"),
+        "flags": flags,
+        "flags_raw": data[2],
         "gear": data[3],
         "plid": data[4],
         "speed": data[5],
@@ -113,38 +493,50 @@ def read_outgauge_data(sock: socket.socket, buffer_size: int = 256) -> dict:
         "fuel": data[9],
         "oil_pressure": data[10],
         "oil_temp": data[11],
-        "dash_lights": parse_flags(data[12], DL_FLAG_KEYS),
-        "show_lights": parse_flags(data[13], DL_FLAG_KEYS),
+        "dash_lights": dash_lights,
+        "dash_lights_raw": data[12],
+        "show_lights": show_lights,
+        "show_lights_raw": data[13],
         "throttle": data[14],
         "brake": data[15],
         "clutch": data[16],
-        "display1": data[17].decode("utf-8"),
-        "display2": data[18].decode("utf-8"),
+        "display1": _decode(data[17].rstrip(b"\x00"), "ascii"),
+        "display2": _decode(data[18].rstrip(b"\x00"), "ascii"),
     }
 
 
-def read_motionsim_data(sock: socket.socket, buffer_size: int = 256) -> dict:
+def read_motionsim_data(sock: socket.socket, buffer_size: Optional[int] = None) -> dict:
     """
     Reads the data from the socket and returns a dict with all of the information
-    from the MotionSim packet.
+    from the MotionSim packet. Packets are received into a buffer shared between
+    calls, so read from a single thread or give each thread its own reader.
     See: https://documentation.beamng.com/modding/protocols/#motionsim-udp-protocol
 
     Parameters
     ----------
     sock : socket.socket
         The socket to read data off of
-    buffer_size : int
-        The size of the buffer to read from the socket
+    buffer_size : int, optional
+        Deprecated and unused, as packets are always received whole. Passing it
+        gives a DeprecationWarning
 
     Returns
     -------
     parsed_data : dict
         The data nicely formatted into a dict
     """
-    raw_data = sock.recvfrom(buffer_size)
-    data = struct.unpack("4sfffffffffffffffffffff", raw_data[0][:88])
+    if buffer_size is not None:
+        _warn_buffer_size()
+    _check_size(_recv_packet(sock, _ms_buf), _MS_STRUCT.size)
+    return _parse_motionsim(_MS_STRUCT.unpack_from(_ms_buf))
+
+
+def _parse_motionsim(data: tuple) -> dict:
+    """
+    Formats the unpacked fields of a MotionSim packet into a dict
+    """
     return {
-        "magic": data[0].decode("utf-8"),
+        "magic": _decode(data[0].rstrip(b"\x00"), "ascii"),
         "pos_x": data[1],
         "pos_y": data[2],
         "pos_z": data[3],
@@ -169,16 +561,570 @@ def read_motionsim_data(sock: socket.socket, buffer_size: int = 256) -> dict:
     }
 
 
+class OutGaugePacket(NamedTuple):
+    """
+    One OutGauge packet as a tuple with named fields, which is cheaper to build than
+    the dict from read_outgauge_data(). The flags are left as their raw integers.
+    """
+
+    time: int
+    car: str
+    flags_raw: int
+    gear: int
+    plid: int
+    speed: float
+    rpm: float
+    turbo: float
+    eng_temp: float
+    fuel: float
+    oil_pressure: float
+    oil_temp: float
+    dash_lights_raw: int
+    show_lights_raw: int
+    throttle: float
+    brake: float
+    clutch: float
+    display1: str
+    display2: str
+
+    def as_dict(self) -> dict:
+        """
+        Returns the packet as the same dict that read_outgauge_data() gives
+        """
+        return {
+            "time": self.time,
+            "car": self.car,
+            "flags": _FlagsView(self.flags_raw, OG_FLAG_MASKS),
+            "flags_raw": self.flags_raw,
+            "gear": self.gear,
+            "plid": self.plid,
+            "speed": self.speed,
+            "rpm": self.rpm,
+            "turbo": self.turbo,
+            "eng_temp": self.eng_temp,
+            "fuel": self.fuel,
+            "oil_pressure": self.oil_pressure,
+            "oil_temp": self.oil_temp,
+            "dash_lights": _FlagsView(self.dash_lights_raw, DL_FLAG_MASKS),
+            "dash_lights_raw": self.dash_lights_raw,
+            "show_lights": _FlagsView(self.show_lights_raw, DL_FLAG_MASKS),
+            "show_lights_raw": self.show_lights_raw,
+            "throttle": self.throttle,
+            "brake": self.brake,
+            "clutch": self.clutch,
+            "display1": self.display1,
+            "display2": self.display2,
+        }
+
+
+class MotionSimPacket(NamedTuple):
+    """
+    One MotionSim packet as a tuple with named fields, which is cheaper to build than
+    the dict from read_motionsim_data()
+    """
+
+    magic: str
+    pos_x: float
+    pos_y: float
+    pos_z: float
+    vel_x: float
+    vel_y: float
+    vel_z: float
+    acc_x: float
+    acc_y: float
+    acc_z: float
+    up_vel_x: float
+    up_vel_y: float
+    up_vel_z: float
+    roll_pos: float
+    pitch_pos: float
+    yaw_pos: float
+    roll_rate: float
+    pitch_rate: float
+    yaw_rate: float
+    roll_acc: float
+    pitch_acc: float
+    yaw_acc: float
+
+    def as_dict(self) -> dict:
+        """
+        Returns the packet as the same dict that read_motionsim_data() gives
+        """
+        return self._asdict()
+
+
+def read_outgauge_packet(sock: socket.socket) -> OutGaugePacket:
+    """
+    Reads the data from the socket like read_outgauge_data(), but returns it as an
+    OutGaugePacket instead of a dict. It also reuses one buffer between calls, so
+    read from a single thread.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+
+    Returns
+    -------
+    packet : OutGaugePacket
+        The data from the packet
+    """
+    _check_size(_recv_packet(sock, _og_buf), _OG_STRUCT.size)
+    data = _OG_STRUCT.unpack_from(_og_buf)
+    return _make_og_packet(
+        (
+            data[0],
+            _decode(data[1].rstrip(b"\x00"), "ascii"),
+            *data[2:17],
+            _decode(data[17].rstrip(b"\x00"), "ascii"),
+            _decode(data[18].rstrip(b"\x00"), "ascii"),
+        )
+    )
+
+
+def read_motionsim_packet(sock: socket.socket) -> MotionSimPacket:
+    """
+    Reads the data from the socket like read_motionsim_data(), but returns it as a
+    MotionSimPacket instead of a dict. It also reuses one buffer between calls, so
+    read from a single thread.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+
+    Returns
+    -------
+    packet : MotionSimPacket
+        The data from the packet
+    """
+    _check_size(_recv_packet(sock, _ms_buf), _MS_STRUCT.size)
+    data = _MS_STRUCT.unpack_from(_ms_buf)
+    return _make_ms_packet((_decode(data[0].rstrip(b"\x00"), "ascii"), *data[1:]))
+
+
+_make_og_packet = OutGaugePacket._make
+_make_ms_packet = MotionSimPacket._make
+
+
+class OutGaugeReader:
+    """
+    Reads OutGauge packets off one socket into a buffer that it owns, so unlike
+    read_outgauge_data() each thread can have its own reader. Everything needed per
+    packet is looked up once here instead of on every read.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+    """
+
+    __slots__ = ("_recv_into", "_buf", "_size", "_flags", "_unpack", "_parse")
+
+    def __init__(self, sock: socket.socket):
+        self._recv_into = sock.recv_into
+        self._buf = bytearray(_OG_STRUCT.size + 1)
+        self._size = _OG_STRUCT.size
+        self._flags = _MSG_TRUNC
+        self._unpack = _OG_STRUCT.unpack_from
+        self._parse = _parse_outgauge
+
+    def read(self, raw_flags: bool = False) -> dict:
+        """
+        Reads the next packet, returning the same dict as read_outgauge_data()
+
+        Parameters
+        ----------
+        raw_flags : bool
+            If True, the flags are left as raw integers, as in read_outgauge_data()
+        """
+        buf = self._buf
+        try:
+            received = self._recv_into(buf, 0, self._flags)
+        except OSError as e:
+            received = _too_long(e, buf)
+        if received != self._size:
+            _check_size(received, self._size)
+        return self._parse(self._unpack(buf), raw_flags)
+
+
+class MotionSimReader:
+    """
+    Reads MotionSim packets off one socket into a buffer that it owns, so unlike
+    read_motionsim_data() each thread can have its own reader. Everything needed per
+    packet is looked up once here instead of on every read.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+    """
+
+    __slots__ = ("_recv_into", "_buf", "_size", "_flags", "_unpack", "_parse")
+
+    def __init__(self, sock: socket.socket):
+        self._recv_into = sock.recv_into
+        self._buf = bytearray(_MS_STRUCT.size + 1)
+        self._size = _MS_STRUCT.size
+        self._flags = _MSG_TRUNC
+        self._unpack = _MS_STRUCT.unpack_from
+        self._parse = _parse_motionsim
+
+    def read(self) -> dict:
+        """
+        Reads the next packet, returning the same dict as read_motionsim_data()
+        """
+        buf = self._buf
+        try:
+            received = self._recv_into(buf, 0, self._flags)
+        except OSError as e:
+            received = _too_long(e, buf)
+        if received != self._size:
+            _check_size(received, self._size)
+        return self._parse(self._unpack(buf))
+
+
+def read_latest_outgauge_data(sock: socket.socket, raw_flags: bool = False) -> dict:
+    """
+    Reads every OutGauge packet waiting on the socket but only parses the newest,
+    for when the program can't keep up with every packet. Blocks until a packet
+    arrives if none are waiting. Reuses one buffer between calls like
+    read_outgauge_data(), so read from a single thread.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+    raw_flags : bool
+        If True, the flags are left as raw integers, as in read_outgauge_data()
+
+    Returns
+    -------
+    parsed_data : dict
+        The newest data, in the same dict as read_outgauge_data()
+    """
+    _check_size(_recv_latest(sock, _og_buf), _OG_STRUCT.size)
+    return _parse_outgauge(_OG_STRUCT.unpack_from(_og_buf), raw_flags)
+
+
+def read_latest_motionsim_data(sock: socket.socket) -> dict:
+    """
+    Reads every MotionSim packet waiting on the socket but only parses the newest,
+    for when the program can't keep up with every packet. Blocks until a packet
+    arrives if none are waiting. Reuses one buffer between calls like
+    read_motionsim_data(), so read from a single thread.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+
+    Returns
+    -------
+    parsed_data : dict
+        The newest data, in the same dict as read_motionsim_data()
+    """
+    _check_size(_recv_latest(sock, _ms_buf), _MS_STRUCT.size)
+    return _parse_motionsim(_MS_STRUCT.unpack_from(_ms_buf))
+
+
+def _recv_latest(sock: socket.socket, buf: bytearray) -> int:
+    """
+    Drains the socket into `buf`, so it's left holding the newest packet, and
+    returns that packet's size
+    """
+    received = _recv_packet(sock, buf)
+    if _MSG_DONTWAIT and not sock.gettimeout():
+        # One syscall per packet, and no select() limit on the fd number. Not with a
+        # timeout though, as Python then waits for the socket before every recv
+        try:
+            while True:
+                received = sock.recv_into(buf, 0, _MSG_TRUNC | _MSG_DONTWAIT)
+        except BlockingIOError:
+            return received
+
+    while select.select([sock], [], [], 0)[0]:
+        received = _recv_packet(sock, buf)
+    return received
+
+
+def read_outgauge_batch(
+    sock: socket.socket, n: int = 64, raw_flags: bool = False
+) -> list[dict]:
+    """
+    Reads up to `n` OutGauge packets that are already waiting on the socket, blocking
+    only until the first one arrives. On Linux this is a single recvmmsg() call.
+    The receive buffers are shared between calls, so this is not thread-safe.
+    Packets of the wrong size are left out with a RuntimeWarning, so that the rest
+    of the batch isn't lost.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+    n : int
+        The maximum number of packets to read
+    raw_flags : bool
+        If True, the flags are left as raw integers, as in read_outgauge_data()
+
+    Returns
+    -------
+    parsed_data : list[dict]
+        The data from each packet, nicely formatted into dicts, oldest first. Can be
+        empty if every packet was the wrong size
+    """
+    return [
+        _parse_outgauge(_OG_STRUCT.unpack_from(packet), raw_flags)
+        for packet in _recv_batch(sock, n, _OG_STRUCT.size)
+    ]
+
+
+def read_motionsim_batch(sock: socket.socket, n: int = 64) -> list[dict]:
+    """
+    Reads up to `n` MotionSim packets that are already waiting on the socket,
+    blocking only until the first one arrives. On Linux this is a single recvmmsg()
+    call. The receive buffers are shared between calls, so this is not thread-safe.
+    Packets of the wrong size are left out with a RuntimeWarning, so that the rest
+    of the batch isn't lost.
+
+    Parameters
+    ----------
+    sock : socket.socket
+        The socket to read data off of
+    n : int
+        The maximum number of packets to read
+
+    Returns
+    -------
+    parsed_data : list[dict]
+        The data from each packet, nicely formatted into dicts, oldest first. Can be
+        empty if every packet was the wrong size
+    """
+    return [
+        _parse_motionsim(_MS_STRUCT.unpack_from(packet))
+        for packet in _recv_batch(sock, n, _MS_STRUCT.size)
+    ]
+
+
+def _recv_batch(sock: socket.socket, n: int, size: int) -> list:
+    """
+    Receives up to `n` datagrams of `size` bytes, waiting only for the first, and
+    drops any of the wrong size
+    """
+    if _recvmmsg is None or sock.gettimeout() is not None:
+        # No recvmmsg() here (or the fd is non-blocking because of a timeout), so
+        # wait for the first packet and then only take what is already queued
+        packets = [_recv_bytes(sock, size)]
+        if _MSG_DONTWAIT and not sock.gettimeout():
+            try:
+                while len(packets) < n:
+                    packets.append(_recv_bytes(sock, size, _MSG_DONTWAIT))
+            except BlockingIOError:
+                pass
+        else:
+            while len(packets) < n and select.select([sock], [], [], 0)[0]:
+                packets.append(_recv_bytes(sock, size))
+        good = [packet for packet in packets if len(packet) == size]
+        if len(good) != len(packets):
+            _warn_dropped(len(packets) - len(good), size)
+        return good
+
+    batch = _get_mmsg_batch(n, size)
+    while True:
+        count = _recvmmsg(
+            sock.fileno(), batch.msgs, n, _MSG_WAITFORONE | _MSG_TRUNC, None
+        )
+        if count >= 0:
+            break
+        err = ctypes.get_errno()
+        if err != errno.EINTR:
+            raise OSError(err, os.strerror(err))
+
+    msgs = batch.msgs
+    good = [batch.views[i] for i in range(count) if msgs[i].msg_len == size]
+    if len(good) != count:
+        _warn_dropped(count - len(good), size)
+    return good
+
+
+def _recv_bytes(sock: socket.socket, size: int, flags: int = 0) -> bytes:
+    """
+    Receives one datagram with a spare byte past `size`, so that a packet which was
+    too long is seen even where it gets cut off
+    """
+    try:
+        return sock.recv(size + 1, flags)
+    except OSError as e:
+        # Re-raises anything but Windows refusing a packet that's too long
+        _too_long(e, b"")
+        return bytes(size + 1)
+
+
+def _warn_dropped(dropped: int, size: int):
+    warnings.warn(
+        f"Dropped {dropped} packet(s) that weren't {size} bytes, check that only one "
+        "stream is being sent to this port",
+        RuntimeWarning,
+        stacklevel=4,
+    )
+
+
+def parse_og_batch(buf, n: Optional[int] = None):
+    """
+    Parses OutGauge packets laid end to end, like a recording of the raw packets,
+    into a NumPy structured array. The buffer is reinterpreted in place rather than
+    unpacking each packet, so this needs NumPy but is very quick for large replays.
+    The fields have the same names as OutGaugePacket, with the strings left as
+    bytes. Flags can be split into boolean arrays with
+    `parse_flags(packets["flags_raw"], OG_FLAG_KEYS)`.
+
+    Parameters
+    ----------
+    buf : bytes-like
+        The raw packets, for example a bytes object, mmap or numpy.ndarray of uint8
+    n : int, optional
+        The number of packets to parse, defaults to every whole packet in `buf`
+
+    Returns
+    -------
+    packets : numpy.ndarray
+        A structured array with one record per packet, sharing memory with `buf`
+    """
+    return _view_packets(buf, n, _og_dtype())
+
+
+def parse_ms_batch(buf, n: Optional[int] = None):
+    """
+    Parses MotionSim packets laid end to end, like a recording of the raw packets,
+    into a NumPy structured array. The buffer is reinterpreted in place rather than
+    unpacking each packet, so this needs NumPy but is very quick for large replays.
+    The fields have the same names as MotionSimPacket, with the magic left as bytes.
+
+    Parameters
+    ----------
+    buf : bytes-like
+        The raw packets, for example a bytes object, mmap or numpy.ndarray of uint8
+    n : int, optional
+        The number of packets to parse, defaults to every whole packet in `buf`
+
+    Returns
+    -------
+    packets : numpy.ndarray
+        A structured array with one record per packet, sharing memory with `buf`
+    """
+    return _view_packets(buf, n, _ms_dtype())
+
+
+def _view_packets(buf, n: Optional[int], dtype):
+    """
+    Reinterprets the first `n` packets in `buf` as records of `dtype`
+    """
+    import numpy as np
+
+    data = np.frombuffer(buf, dtype=np.uint8)
+    if n is None:
+        n = len(data) // dtype.itemsize
+    elif n * dtype.itemsize > len(data):
+        raise ValueError(f"buffer only has {len(data) // dtype.itemsize} packets")
+
+    return data[: n * dtype.itemsize].view(dtype)
+
+
+@functools.lru_cache(maxsize=None)
+def _og_dtype():
+    """
+    NumPy version of _OG_STRUCT, only built once NumPy is actually needed
+    """
+    import numpy as np
+
+    formats = ["u4", "S4", "u2", "i1", "i1"] + ["f4"] * 7 + ["u4", "u4"]
+    formats += ["f4"] * 3 + ["S16", "S16"]
+    return np.dtype(
+        {
+            "names": list(OutGaugePacket._fields),
+            "formats": ["=" + f for f in formats],
+            "itemsize": _OG_STRUCT.size,
+        }
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _ms_dtype():
+    """
+    NumPy version of _MS_STRUCT, only built once NumPy is actually needed
+    """
+    import numpy as np
+
+    return np.dtype(
+        {
+            "names": list(MotionSimPacket._fields),
+            "formats": ["S4"] + ["=f4"] * 21,
+            "itemsize": _MS_STRUCT.size,
+        }
+    )
+
+
 def main():
     """
     Sample test program which will simply output data until you press Ctrl+C
     """
+    # Only imported here so that programs using pyog as a library don't pay for them.
+    # orjson is optional, but serializes packets much faster than the json module
+    try:
+        import orjson
+    except ImportError:
+        import json
+
+        def dumps(obj) -> bytes:
+            return json.dumps(obj).encode()
+
+    else:
+        dumps = orjson.dumps
+
     IP = "127.0.0.1"
     PORT = 4444
 
-    with create_socket(IP, PORT) as sock:
+    # A bigger buffer than stdout's own means far fewer write() calls per packet when
+    # piping to a file or program, but a terminal should still show each line at once
+    interactive = sys.stdout.isatty()
+    with create_socket(IP, PORT) as sock, open(
+        sys.stdout.fileno(), "wb", buffering=1 << 16, closefd=False
+    ) as out:
         while True:
-            print(json.dumps(read_outgauge_data(sock)))
+            # Plain dicts of flags serialize without calling back into Python
+            data = read_outgauge_data(sock, raw_flags=True)
+            data["flags"] = parse_og_flags(data["flags"])
+            data["dash_lights"] = parse_dl_flags(data["dash_lights"])
+            data["show_lights"] = parse_dl_flags(data["show_lights"])
+            out.write(dumps(data))
+            out.write(b"\n")
+            if interactive:
+                out.flush()
+
+
+# Swap in the compiled readers when the optional pyog_fast extension has been built.
+# It doesn't import this module, but is handed what it needs from here, so this has
+# to stay after everything else is defined
+try:
+    import pyog_fast as _fast
+except ImportError:
+    pass
+else:
+    _fast._bind(_FlagsView, OG_FLAG_MASKS, DL_FLAG_MASKS, _check_size, _too_long)
+    # Keep the docstrings from here, so that help() still lists the parameters
+    _fast.read_outgauge_data.__doc__ = read_outgauge_data.__doc__
+    _fast.read_motionsim_data.__doc__ = read_motionsim_data.__doc__
+    read_outgauge_data = _fast.read_outgauge_data
+    read_motionsim_data = _fast.read_motionsim_data
+
+    # Extension types can't have their docstrings changed, so subclass them instead
+    class OutGaugeReader(_fast.OutGaugeReader):
+        __doc__ = OutGaugeReader.__doc__
+        __slots__ = ()
+
+    class MotionSimReader(_fast.MotionSimReader):
+        __doc__ = MotionSimReader.__doc__
+        __slots__ = ()
 
 
 if __name__ == "__main__":
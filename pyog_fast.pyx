@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# cython: language_level=3
+"""
+Compiled versions of the pyog packet readers. pyog picks these up automatically when
+this extension has been built, so import pyog rather than this module.
+
+This module doesn't import pyog, so that the two can be imported in either order.
+Instead pyog hands over the pieces they share by calling _bind() as it loads.
+"""
+import socket
+import warnings
+
+from libc.string cimport memcpy
+
+
+
+# Same layouts as pyog._OG_STRUCT and pyog._MS_STRUCT
+cdef struct og_packet:
+    unsigned int time
+    char car[4]
+    unsigned short flags
+    signed char gear
+    signed char plid
+    float speed
+    float rpm
+    float turbo
+    float eng_temp
+    float fuel
+    float oil_pressure
+    float oil_temp
+    unsigned int dash_lights
+    unsigned int show_lights
+    float throttle
+    float brake
+    float clutch
+    char display1[16]
+    char display2[16]
+    char padding[4]
+
+
+cdef struct ms_packet:
+    char magic[4]
+    float pos_x
+    float pos_y
+    float pos_z
+    float vel_x
+    float vel_y
+    float vel_z
+    float acc_x
+    float acc_y
+    float acc_z
+    float up_vel_x
+    float up_vel_y
+    float up_vel_z
+    float roll_pos
+    float pitch_pos
+    float yaw_pos
+    float roll_rate
+    float pitch_rate
+    float yaw_rate
+    float roll_acc
+    float pitch_acc
+    float yaw_acc
+
+
+cdef Py_ssize_t OG_SIZE = sizeof(og_packet)
+cdef Py_ssize_t MS_SIZE = sizeof(ms_packet)
+
+# Used by the module level readers, so those are not thread-safe. Like pyog's, they
+# have a spare byte to catch packets that are too long
+cdef bytearray _og_buf = bytearray(OG_SIZE + 1)
+cdef bytearray _ms_buf = bytearray(MS_SIZE + 1)
+
+# Makes Linux report a packet's real size even when it didn't fit in the buffer
+cdef int _MSG_TRUNC = getattr(socket, "MSG_TRUNC", 0)
+
+# Shared with pyog, and set by it through _bind()
+cdef object _FlagsView = None
+cdef dict OG_FLAG_MASKS = None
+cdef dict DL_FLAG_MASKS = None
+cdef object _raise_size_error = None
+cdef object _too_long = None
+
+
+def _bind(flags_view, og_flag_masks, dl_flag_masks, check_size, too_long):
+    """
+    Called by pyog with its _FlagsView, OG_FLAG_MASKS, DL_FLAG_MASKS, _check_size()
+    and _too_long(), which must happen before any packets are read
+    """
+    global _FlagsView, OG_FLAG_MASKS, DL_FLAG_MASKS, _raise_size_error, _too_long
+    _FlagsView = flags_view
+    OG_FLAG_MASKS = og_flag_masks
+    DL_FLAG_MASKS = dl_flag_masks
+    _raise_size_error = check_size
+    _too_long = too_long
+
+
+cdef inline str _decode_padded(const char* s, Py_ssize_t n):
+    # Matches bytes.rstrip(b"\x00") followed by decoding as ASCII
+    while n > 0 and s[n - 1] == 0:
+        n -= 1
+    return s[:n].decode("ascii")
+
+
+cdef inline void _check_size(Py_ssize_t received, Py_ssize_t size) except *:
+    # Only calls pyog's check for the error, so the message is kept in one place
+    if received != size:
+        _raise_size_error(received, size)
+
+
+cdef Py_ssize_t _recv(object recv_into, bytearray buf) except -1:
+    # Same as pyog._recv_packet()
+    try:
+        return recv_into(buf, 0, _MSG_TRUNC)
+    except OSError as e:
+        return _too_long(e, buf)
+
+
+cdef void _warn_buffer_size() except *:
+    # No Python frame of our own, so the caller is already the first level
+    warnings.warn(
+        "buffer_size is unused and will be removed, packets are always received "
+        "whole",
+        DeprecationWarning,
+        stacklevel=1,
+    )
+
+
+cdef dict _og_dict(const char* buf, bint raw_flags=False):
+    cdef og_packet p
+    memcpy(&p, buf, sizeof(og_packet))
+    if raw_flags:
+        flags, dash_lights, show_lights = p.flags, p.dash_lights, p.show_lights
+    else:
+        flags = _FlagsView(p.flags, OG_FLAG_MASKS)
+        dash_lights = _FlagsView(p.dash_lights, DL_FLAG_MASKS)
+        show_lights = _FlagsView(p.show_lights, DL_FLAG_MASKS)
+    return {
+        "time": p.time,
+        "car": _decode_padded(p.car, 4),
+        "flags": flags,
+        "flags_raw": p.flags,
+        "gear": p.gear,
+        "plid": p.plid,
+        "speed": p.speed,
+        "rpm": p.rpm,
+        "turbo": p.turbo,
+        "eng_temp": p.eng_temp,
+        "fuel": p.fuel,
+        "oil_pressure": p.oil_pressure,
+        "oil_temp": p.oil_temp,
+        "dash_lights": dash_lights,
+        "dash_lights_raw": p.dash_lights,
+        "show_lights": show_lights,
+        "show_lights_raw": p.show_lights,
+        "throttle": p.throttle,
+        "brake": p.brake,
+        "clutch": p.clutch,
+        "display1": _decode_padded(p.display1, 16),
+        "display2": _decode_padded(p.display2, 16),
+    }
+
+
+cdef dict _ms_dict(const char* buf):
+    cdef ms_packet p
+    memcpy(&p, buf, sizeof(ms_packet))
+    return {
+        "magic": _decode_padded(p.magic, 4),
+        "pos_x": p.pos_x,
+        "pos_y": p.pos_y,
+        "pos_z": p.pos_z,
+        "vel_x": p.vel_x,
+        "vel_y": p.vel_y,
+        "vel_z": p.vel_z,
+        "acc_x": p.acc_x,
+        "acc_y": p.acc_y,
+        "acc_z": p.acc_z,
+        "up_vel_x": p.up_vel_x,
+        "up_vel_y": p.up_vel_y,
+        "up_vel_z": p.up_vel_z,
+        "roll_pos": p.roll_pos,
+        "pitch_pos": p.pitch_pos,
+        "yaw_pos": p.yaw_pos,
+        "roll_rate": p.roll_rate,
+        "pitch_rate": p.pitch_rate,
+        "yaw_rate": p.yaw_rate,
+        "roll_acc": p.roll_acc,
+        "pitch_acc": p.pitch_acc,
+        "yaw_acc": p.yaw_acc,
+    }
+
+
+def read_outgauge_data(sock, buffer_size=None, bint raw_flags=False):
+    """
+    Compiled version of pyog.read_outgauge_data()
+    """
+    if buffer_size is not None:
+        _warn_buffer_size()
+    _check_size(_recv(sock.recv_into, _og_buf), OG_SIZE)
+    return _og_dict(_og_buf, raw_flags)
+
+
+def read_motionsim_data(sock, buffer_size=None):
+    """
+    Compiled version of pyog.read_motionsim_data()
+    """
+    if buffer_size is not None:
+        _warn_buffer_size()
+    _check_size(_recv(sock.recv_into, _ms_buf), MS_SIZE)
+    return _ms_dict(_ms_buf)
+
+
+cdef class OutGaugeReader:
+    """
+    Reads OutGauge packets off one socket into a buffer that it owns
+    """
+
+    cdef object _recv_into
+    cdef bytearray _buf
+
+    def __init__(self, sock):
+        self._recv_into = sock.recv_into
+        self._buf = bytearray(OG_SIZE + 1)
+
+    def read(self, bint raw_flags=False):
+        """
+        Reads the next packet, returning the same dict as read_outgauge_data()
+
+        Parameters
+        ----------
+        raw_flags : bool
+            If True, the flags are left as raw integers, as in read_outgauge_data()
+        """
+        _check_size(_recv(self._recv_into, self._buf), OG_SIZE)
+        return _og_dict(self._buf, raw_flags)
+
+
+cdef class MotionSimReader:
+    """
+    Reads MotionSim packets off one socket into a buffer that it owns
+    """
+
+    cdef object _recv_into
+    cdef bytearray _buf
+
+    def __init__(self, sock):
+        self._recv_into = sock.recv_into
+        self._buf = bytearray(MS_SIZE + 1)
+
+    def read(self):
+        """
+        Reads the next packet, returning the same dict as read_motionsim_data()
+        """
+        _check_size(_recv(self._recv_into, self._buf), MS_SIZE)
+        return _ms_dict(self._buf)
@@ -1,9 +1,23 @@
 # -*- coding: utf-8 -*-
+from setuptools import Extension
 from setuptools import setup
 
+# The compiled readers are optional, pyog falls back to pure Python without them
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [Extension("pyog_fast", ["pyog_fast.pyx"], optional=True)],
+        language_level=3,
+    )
+
 setup(
     name="pyog",
     version="0.1.1",
     description="Python OutGauge Library",
     py_modules=["pyog"],
+    ext_modules=ext_modules,
+    extras_require={"orjson": ["orjson"], "numpy": ["numpy"]},
 )
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+import socket
+import struct
+import warnings
+
+import pytest
+
+import pyog
+
+# Every float is exact in 32 bits, so they compare equal after a round trip
+OG_FIELDS = (
+    7,
+    b"ETK",
+    0x2001,
+    3,
+    -1,
+    10.5,
+    3000.0,
+    0.5,
+    90.0,
+    0.25,
+    2.0,
+    95.0,
+    0b101,
+    0b1,
+    0.75,
+    0.125,
+    0.0,
+    b"hello",
+    b"there",
+)
+MS_FIELDS = (b"BNG1",) + tuple(float(i) for i in range(21))
+
+
+def og_packet(time: int = 7) -> bytes:
+    return pyog._OG_STRUCT.pack(time, *OG_FIELDS[1:])
+
+
+def ms_packet() -> bytes:
+    return pyog._MS_STRUCT.pack(*MS_FIELDS)
+
+
+def plain(data: dict) -> dict:
+    """
+    Turns the flag views into dicts so that packets can be compared
+    """
+    return {key: dict(v) if hasattr(v, "keys") else v for key, v in data.items()}
+
+
+@pytest.fixture
+def sock():
+    with pyog.create_socket("127.0.0.1", 0) as sock:
+        yield sock
+
+
+@pytest.fixture
+def send(sock):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+
+        def send(*packets: bytes):
+            for packet in packets:
+                sender.sendto(packet, sock.getsockname())
+
+        yield send
+
+
+def test_read_outgauge_data(sock, send):
+    send(og_packet())
+    data = pyog.read_outgauge_data(sock)
+
+    assert data["time"] == 7
+    assert data["car"] == "ETK"
+    assert data["gear"] == 3
+    assert data["plid"] == -1
+    assert data["speed"] == 10.5
+    assert data["clutch"] == 0.0
+    assert data["display1"] == "hello"
+    assert dict(data["flags"]) == pyog.parse_og_flags(0x2001)
+    assert data["dash_lights"]["handbrake"]
+    assert not data["show_lights"]["handbrake"]
+    assert data["dash_lights_raw"] == 0b101
+
+
+def test_read_outgauge_data_raw_flags(sock, send):
+    send(og_packet())
+    data = pyog.read_outgauge_data(sock, raw_flags=True)
+
+    assert data["flags"] == 0x2001
+    assert data["dash_lights"] & pyog.DL_FLAG_MASKS["handbrake"]
+
+
+def test_read_motionsim_data(sock, send):
+    send(ms_packet())
+    data = pyog.read_motionsim_data(sock)
+
+    assert data["magic"] == "BNG1"
+    assert data["pos_x"] == 0.0
+    assert data["yaw_acc"] == 20.0
+
+
+def test_read_outgauge_floats(sock, send):
+    send(og_packet())
+    floats = pyog.read_outgauge_floats(sock)
+
+    assert list(floats) == [OG_FIELDS[i] for i in (*range(5, 12), *range(14, 17))]
+
+
+def test_packets_match_dicts(sock, send):
+    send(og_packet(), og_packet(), ms_packet(), ms_packet())
+
+    as_dict = pyog.read_outgauge_packet(sock).as_dict()
+    data = pyog.read_outgauge_data(sock)
+    assert plain(as_dict) == plain(data)
+    assert list(as_dict) == list(data)
+    assert pyog.read_motionsim_packet(sock).as_dict() == pyog.read_motionsim_data(sock)
+
+
+def test_readers(sock, send):
+    send(og_packet(), og_packet(), ms_packet())
+
+    reader = pyog.OutGaugeReader(sock)
+    assert reader.read()["rpm"] == 3000.0
+    assert reader.read(raw_flags=True)["show_lights"] == 0b1
+    assert pyog.MotionSimReader(sock).read()["pos_y"] == 1.0
+
+
+@pytest.mark.parametrize("timeout", [None, 1.0])
+def test_read_latest(sock, send, timeout):
+    sock.settimeout(timeout)
+    send(og_packet(1), og_packet(2), og_packet(3))
+    assert pyog.read_latest_outgauge_data(sock)["time"] == 3
+
+    send(ms_packet(), ms_packet())
+    assert pyog.read_latest_motionsim_data(sock)["magic"] == "BNG1"
+
+
+@pytest.mark.parametrize("recvmmsg", [True, False])
+@pytest.mark.parametrize("timeout", [None, 1.0])
+def test_read_batch(sock, send, monkeypatch, recvmmsg, timeout):
+    if not recvmmsg:
+        monkeypatch.setattr(pyog, "_recvmmsg", None)
+    sock.settimeout(timeout)
+
+    send(*(og_packet(time) for time in range(5)))
+    assert [data["time"] for data in pyog.read_outgauge_batch(sock)] == list(range(5))
+
+    send(ms_packet(), ms_packet(), ms_packet())
+    assert len(pyog.read_motionsim_batch(sock, 2)) == 2
+    assert len(pyog.read_motionsim_batch(sock, 2)) == 1
+
+
+@pytest.mark.parametrize("packet", [og_packet() + b"x", og_packet()[:-1]])
+@pytest.mark.parametrize(
+    "read",
+    [
+        pyog.read_outgauge_data,
+        pyog.read_outgauge_floats,
+        pyog.read_outgauge_packet,
+        pyog.read_latest_outgauge_data,
+        lambda sock: pyog.OutGaugeReader(sock).read(),
+    ],
+)
+def test_wrong_size(sock, send, packet, read):
+    send(packet)
+    with pytest.raises(struct.error):
+        read(sock)
+
+
+def test_wrong_size_without_msg_trunc(sock, send, monkeypatch):
+    # Like macOS and the BSDs, where a long packet is only cut off
+    monkeypatch.setattr(pyog, "_MSG_TRUNC", 0)
+    send(og_packet() + b"xyz")
+    with pytest.raises(struct.error):
+        pyog.read_outgauge_packet(sock)
+
+
+@pytest.mark.parametrize("recvmmsg", [True, False])
+def test_batch_drops_wrong_size(sock, send, monkeypatch, recvmmsg):
+    if not recvmmsg:
+        monkeypatch.setattr(pyog, "_recvmmsg", None)
+    send(og_packet(1), og_packet() + b"x", og_packet(2), og_packet()[:10])
+
+    with pytest.warns(RuntimeWarning, match="Dropped 2"):
+        batch = pyog.read_outgauge_batch(sock)
+    assert [data["time"] for data in batch] == [1, 2]
+
+
+def test_buffer_size_is_deprecated(sock, send):
+    send(og_packet(), og_packet())
+    with pytest.warns(DeprecationWarning):
+        pyog.read_outgauge_data(sock, 256)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        pyog.read_outgauge_data(sock)
+
+
+def test_create_socket_cpu_needs_reuse_port():
+    with pytest.raises((ValueError, NotImplementedError)):
+        pyog.create_socket("127.0.0.1", 0, cpu=0)
+
+
+def test_parse_flags():
+    for value in (0, 1, 0x2001, 0xFFFF, -1):
+        assert pyog.parse_og_flags(value) == pyog.parse_flags(value, pyog.OG_FLAG_KEYS)
+        assert pyog.parse_dl_flags(value) == pyog.parse_flags(value, pyog.DL_FLAG_KEYS)
+
+
+def test_parse_og_batch(sock, send):
+    pytest.importorskip("numpy")
+    recording = b"".join(og_packet(time) for time in range(3))
+    packets = pyog.parse_og_batch(recording)
+
+    send(og_packet(2))
+    expected = pyog.read_outgauge_packet(sock)
+    record = packets[2]
+    for field in pyog.OutGaugePacket._fields:
+        value = record[field]
+        if isinstance(value, bytes):
+            value = value.rstrip(b"\x00").decode("ascii")
+        assert value == getattr(expected, field), field
+    assert list(packets["time"]) == [0, 1, 2]
+
+
+def test_parse_ms_batch(sock, send):
+    pytest.importorskip("numpy")
+    packets = pyog.parse_ms_batch(ms_packet() * 2)
+
+    send(ms_packet())
+    expected = pyog.read_motionsim_packet(sock)
+    assert len(packets) == 2
+    assert packets[1]["magic"] == b"BNG1"
+    assert [float(packets[1][field]) for field in expected._fields[1:]] == list(
+        expected[1:]
+    )
+
+
+@pytest.mark.parametrize("raw_flags", [False, True])
+def test_compiled_matches_python(sock, send, raw_flags):
+    fast = pytest.importorskip("pyog_fast")
+    expected = pyog._parse_outgauge(pyog._OG_STRUCT.unpack(og_packet()), raw_flags)
+
+    send(og_packet(), og_packet())
+    data = fast.read_outgauge_data(sock, raw_flags=raw_flags)
+    assert plain(data) == plain(expected)
+    assert list(data) == list(expected)
+    assert plain(fast.OutGaugeReader(sock).read(raw_flags)) == plain(expected)
+
+    expected = pyog._parse_motionsim(pyog._MS_STRUCT.unpack(ms_packet()))
+    send(ms_packet(), ms_packet())
+    assert fast.read_motionsim_data(sock) == expected
+    assert fast.MotionSimReader(sock).read() == expected
+
+
+@pytest.mark.parametrize("packet", [og_packet() + b"x", og_packet()[:-1]])
+def test_compiled_wrong_size(sock, send, packet):
+    fast = pytest.importorskip("pyog_fast")
+    send(packet, packet)
+    with pytest.raises(struct.error):
+        fast.read_outgauge_data(sock)
+    with pytest.raises(struct.error):
+        fast.OutGaugeReader(sock).read()
+
+
+def test_compiled_readers_are_used():
+    pytest.importorskip("pyog_fast")
+    assert pyog.read_outgauge_data.__module__ == "pyog_fast"
+    assert pyog.read_outgauge_data.__doc__ == pyog._fast.read_outgauge_data.__doc__
+    assert "raw_flags" in pyog.OutGaugeReader.read.__doc__